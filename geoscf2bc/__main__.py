@@ -18,6 +18,14 @@ Notes:
         '--cffreq', default='3h',
         help='Default frequency. To be read by pd.date_range'
     )
+    _ = prsr.add_argument(
+        '--workers', default=1, type=int,
+        help='Number of dates to process concurrently'
+    )
+    _ = prsr.add_argument(
+        '--threads', default=1, type=int,
+        help='Number of threads to interpolate each translated hour'
+    )
     _ = prsr.add_argument(
         '--gdpath', default='GRIDDESC',
         help='Path to IOAPI GRIDDESC file with GDNAM definition'
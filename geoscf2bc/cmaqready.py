@@ -8,8 +8,8 @@ __doc__ = """
 ---
 
 CMAQ requires hourly files that cover an entire day. This notebook takes
-instantaneous files at a varible frequency (3h), stacks them, and interpolates
-between them to make CMAQ-Ready inputs
+instantaneous files at a varible frequency (3h), stacks them, and linearly
+interpolates between them to make CMAQ-Ready inputs
 
 
 Example Application:
@@ -25,8 +25,176 @@ Example Application:
 """
 
 
+def _ioapistr(text, length=80*60):
+    """
+    Returns text as ASCII padded/truncated to exactly length characters, as
+    IOAPI expects for FILEDESC and HISTORY (60 lines of 80 characters).
+    Non-ASCII characters are replaced so they cannot change the byte length.
+    """
+    buf = text.encode('ascii', 'replace')[:length].ljust(length, b' ')
+    return buf.decode('ascii')
+
+
+def _concat_one(date, intmpl, outtmpl, infreq, outfreq, backend, verbose):
+    """
+    Make one CMAQ-ready daily file; see concat for arguments.
+
+    Module-level so it can be dispatched to worker processes.
+    """
+    import pandas as pd
+    import numpy as np
+    import netCDF4 as nc
+    import xarray as xr
+    import os
+    import shutil
+    from . import __version__ as proc_version
+
+    edate = date + pd.Timedelta(24, unit='h')
+    times = pd.date_range(date, edate, freq=infreq)
+    hourly_times = pd.date_range(date, edate, freq=outfreq)
+    daypath = date.strftime(outtmpl)
+    if backend == 'zarr':
+        daypath = daypath + '.zarr'
+    if os.path.exists(daypath):
+        print('Using cached', daypath, flush=True)
+        return daypath
+
+    paths = [hdate.strftime(intmpl) for hdate in times]
+    # Write to a temporary name and rename once complete, so a failed or
+    # interrupted day never leaves a partial file that looks cached.
+    tmppath = daypath + '.tmp'
+
+    # Linear interpolation weights from input knots to output times.
+    # idx is the knot at or before each output time; w is the fraction
+    # of the way to the next knot.
+    insec = times.values.astype('datetime64[s]').astype('i8')
+    outsec = hourly_times.values.astype('datetime64[s]').astype('i8')
+    idx = np.searchsorted(insec, outsec, side='right') - 1
+    idx = np.clip(idx, 0, insec.size - 2)
+    w = ((outsec - insec[idx]) / (insec[idx + 1] - insec[idx]))
+    w = w.astype('f')
+
+    def readknot(inf):
+        # Raw values; skip CF mask/scale decoding (decode_cf=False).
+        # All species are stacked (nvar, LAY, PERIM) so that blending and
+        # clamping are single array operations.
+        # Cast once to float32 so the blend never promotes to float64.
+        inf.set_auto_maskandscale(False)
+        knot = np.stack([inf.variables[vk][0] for vk in datakeys])
+        return knot.astype('f4', copy=False)
+
+    # The first input defines dimensions, variables and metadata, and
+    # is also the first knot, so it is opened only once.
+    with nc.Dataset(paths[0]) as tmplf:
+        attrs = {k: tmplf.getncattr(k) for k in tmplf.ncattrs()}
+        dims = {dk: len(dim) for dk, dim in tmplf.dimensions.items()}
+        dims['TSTEP'] = hourly_times.size
+        vardefs = {
+            vk: (
+                'i4' if vk == 'TFLAG' else 'f4', var.dimensions,
+                {k: var.getncattr(k) for k in var.ncattrs()}
+            )
+            for vk, var in tmplf.variables.items()
+        }
+        datakeys = [vk for vk in vardefs if vk != 'TFLAG']
+        nextknot = readknot(tmplf)
+
+    # Stream knot pairs into a preallocated output, so that at most two
+    # input files are held in memory and each is closed once read.
+    if backend == 'zarr':
+        outvars = {
+            vk: np.empty([dims[dk] for dk in vdims], dtype=dtype)
+            for vk, (dtype, vdims, vattrs) in vardefs.items()
+        }
+    else:
+        outf = nc.Dataset(tmppath, 'w', format='NETCDF4_CLASSIC')
+        for dk, dlen in dims.items():
+            outf.createDimension(dk, None if dk == 'TSTEP' else dlen)
+        for vk, (dtype, vdims, vattrs) in vardefs.items():
+            # No DEFLATE/shuffle and no pre-fill: every value is written,
+            # and the file only reaches daypath once complete (tmppath),
+            # so unwritten steps can never be read as data.
+            # TSTEP is unlimited (IOAPI), so HDF5 cannot store contiguous;
+            # one chunk for the whole day is the equivalent layout.
+            chunksizes = [dims[dk] for dk in vdims]
+            outvar = outf.createVariable(
+                vk, dtype, vdims, zlib=False, shuffle=False,
+                chunksizes=chunksizes, fill_value=False
+            )
+            outvar.setncatts(vattrs)
+        outvars = outf.variables
+
+    try:
+        for ki in range(len(paths) - 1):
+            prevknot = nextknot
+            with nc.Dataset(paths[ki + 1]) as inf:
+                nextknot = readknot(inf)
+            steps = np.flatnonzero(idx == ki)
+            if steps.size == 0:
+                continue
+            wb = w[steps].reshape(1, -1, 1, 1)
+            vals = prevknot[:, None] * (1 - wb) + nextknot[:, None] * wb
+            np.maximum(vals, np.float32(1e-30), out=vals)
+            for vi, vk in enumerate(datakeys):
+                outvars[vk][steps[0]:steps[-1] + 1] = vals[vi]
+
+        # YYYYJJJ and HHMMSS from integer accessors (no per-element strftime)
+        jdays = hourly_times.year * 1000 + hourly_times.dayofyear
+        ihhmmss = (
+            hourly_times.hour * 10000 + hourly_times.minute * 100
+            + hourly_times.second
+        )
+        jdays = np.asarray(jdays, dtype='i')[:, None]
+        ihhmmss = np.asarray(ihhmmss, dtype='i')[:, None]
+        tflag = np.zeros(outvars['TFLAG'].shape, 'i')
+        tflag[:, :, 0] = jdays
+        tflag[:, :, 1] = ihhmmss
+        outvars['TFLAG'][:] = tflag
+        # Add descriptive metadata
+        FILEDESC = (
+            'Hourly values linearly interpolated in time (numpy'
+            + f' {np.__version__}) from individual files \n'
+            + f'{os.getcwd()}/{intmpl}\nwith dates: \n - '
+            + ',\n - '.join(times.strftime('%Y-%m-%dT%H:%M:%SZ'))
+        )
+        now = pd.to_datetime('now', utc=True)
+        wdate = int(now.strftime('%Y%j'))
+        wtime = int(now.strftime('%H%M%S'))
+        history = f'Processed by geoscf2bc.cmaqread.concat (v{proc_version}'
+        attrs.update(dict(
+            WDATE=np.int32(wdate), WTIME=np.int32(wtime),
+            CDATE=np.int32(wdate), CTIME=np.int32(wtime),
+            FILEDESC=_ioapistr(FILEDESC),
+            HISTORY=_ioapistr(history)
+        ))
+        if backend == 'zarr':
+            daybcfile = xr.Dataset({
+                vk: xr.DataArray(outvars[vk], dims=vdims, attrs=vattrs)
+                for vk, (dtype, vdims, vattrs) in vardefs.items()
+            }, attrs=attrs)
+            daybcfile.chunk({'TSTEP': hourly_times.size}).to_zarr(
+                tmppath, mode='w', consolidated=True
+            )
+        else:
+            outf.setncatts(attrs)
+            outf.close()
+    except BaseException:
+        # Do not leave an open or partial temporary file behind
+        if backend != 'zarr' and outf.isopen():
+            outf.close()
+        if os.path.isdir(tmppath):
+            shutil.rmtree(tmppath)
+        elif os.path.exists(tmppath):
+            os.remove(tmppath)
+        raise
+    os.replace(tmppath, daypath)
+
+    return daypath
+
+
 def concat(
-    GDNAM, dates, intmpl, outtmpl, infreq='3h', outfreq='1h', verbose=0
+    GDNAM, dates, intmpl, outtmpl, infreq='3h', outfreq='1h',
+    backend='netcdf', workers=1, verbose=0
 ):
     """
     Arguments
@@ -43,6 +211,14 @@ def concat(
         Frequency of input files to read (e.g., 3h=every 3 hours)
     outfreq : str
         Output files are daily and typically have hourly (1h) frquency.
+    backend : str
+        netcdf (default) writes the IOAPI-like NETCDF4_CLASSIC file that
+        CMAQ reads. zarr writes the same content to outtmpl + '.zarr' with
+        consolidated metadata, which is much faster to write and to read
+        with xarray/dask, but must be converted to netCDF before CMAQ can
+        use it.
+    workers : int
+        Number of days to make concurrently in separate processes.
     verbose : int
         Level of verbosity
 
@@ -52,62 +228,19 @@ def concat(
         List of files made by concat
     """
     import pandas as pd
-    import xarray as xr
-    import numpy as np
-    import os
-    from . import __version__ as proc_version
+    from joblib import Parallel, delayed
 
-    outpaths = []
     dates = pd.to_datetime(dates)
-    for date in dates:
-        edate = date + pd.Timedelta(24, unit='h')
-        times = pd.date_range(date, edate, freq=infreq)
-        hourly_times = pd.date_range(date, edate, freq=outfreq)
-        daypath = date.strftime(outtmpl)
-        if os.path.exists(daypath):
-            outpaths.append(daypath)
-            print('Using cached', daypath, flush=True)
-            continue
-
-        paths = [hdate.strftime(intmpl) for hdate in times]
-
-        bcfiles = [xr.open_dataset(path) for path in paths]
-        bcfile = xr.concat(bcfiles, dim='TSTEP')
-        bcfile.attrs.update(bcfiles[0].attrs)
-        bcfile.coords['TSTEP'] = times
-        daybcfile = bcfile.interp(TSTEP=hourly_times)
-        for vk in daybcfile.data_vars:
-            if vk == 'TFLAG':
-                daybcfile[vk] = daybcfile[vk].astype('i')
-            else:
-                daybcfile[vk] = np.maximum(daybcfile[vk].astype('f'), 1e-30)
-
-        jdays = hourly_times.strftime('%Y%j').astype('i').values[:, None]
-        ihhmmss = hourly_times.strftime('%H%M%S').astype('i').values[:, None]
-        daybcfile['TFLAG'][:, :, 0] = jdays
-        daybcfile['TFLAG'][:, :, 1] = ihhmmss
-        daybcfile['TFLAG'][:, 0]
-        # Add descriptive metadata
-        FILEDESC = (
-            'Hourly values interpolated using default xarray'
-            + f' ({xr.__version__}) DataArray. interp from individual files \n'
-            + f'{os.getcwd()}/{intmpl}\nwith dates: \n - '
-            + ',\n - '.join(times.strftime('%Y-%m-%dT%H:%M:%SZ'))
+    # Each day is independent. Processes (not threads) because the
+    # blend is CPU-bound; results come back in the order of dates.
+    outpaths = Parallel(n_jobs=workers, verbose=verbose)(
+        delayed(_concat_one)(
+            date, intmpl, outtmpl, infreq, outfreq, backend, verbose
         )
-        now = pd.to_datetime('now', utc=True)
-        wdate = int(now.strftime('%Y%j'))
-        wtime = int(now.strftime('%H%M%S'))
-        history = f'Processed by geoscf2bc.cmaqread.concat (v{proc_version}'
-        daybcfile.attrs.update(dict(
-            WDATE=np.int32(wdate), WTIME=np.int32(wtime),
-            CDATE=np.int32(wdate), CTIME=np.int32(wtime),
-            FILEDESC=FILEDESC.ljust(80*60)[:80*60],
-            HISTORY=history.ljust(80*60)[:80*60]
-        ))
-        daybcfile.to_netcdf(daypath, format='NETCDF4_CLASSIC')
-        outpaths.append(daypath)
+        for date in dates
+    )
 
-    return outpaths
+    return list(outpaths)
 
 
 if __name__ == '__main__':
@@ -3,12 +3,14 @@ __all__ = [
     'griddescpath'
 ]
 import os
-from glob import glob
 
 
 defroot = os.path.realpath(os.path.dirname(__file__))
-defpaths = tuple(sorted(glob(os.path.join(defroot, '*'))))
-metdefpath = [p for p in defpaths if p.endswith('geoscf_met.txt')][0]
-cb6r4defpath = [p for p in defpaths if p.endswith('geoscf_cb6r4.txt')][0]
-ae7defpath = [p for p in defpaths if p.endswith('geoscf_ae7.txt')][0]
-griddescpath = [p for p in defpaths if p.endswith('GRIDDESC')][0]
+metdefpath = os.path.join(defroot, 'geoscf_met.txt')
+cb6r4defpath = os.path.join(defroot, 'geoscf_cb6r4.txt')
+ae7defpath = os.path.join(defroot, 'geoscf_ae7.txt')
+griddescpath = os.path.join(defroot, 'GRIDDESC')
+defpaths = (metdefpath, cb6r4defpath, ae7defpath, griddescpath)
+for _p in defpaths:
+    assert os.path.exists(_p), f'missing definition file: {_p}'
+del _p
@@ -3,7 +3,8 @@ __all__ = ['default']
 
 def default(
     GDNAM, gdpath, SDATE, EDATE, m3path=None, cffreq='3h', extract_only=False,
-    ftype=2, verbose=0
+    ftype=2, workers=1, extract_output='netcdf', complevel=0, verbose=0,
+    threads=1
 ):
     """
     Arguments
@@ -26,6 +27,17 @@ def default(
         the long extraction process.
     ftype : int
         2=bcon, 1=icon
+    workers : int
+        Number of dates to extract, and days to concatenate, concurrently.
+    extract_output : str
+        netcdf (default) extracts to one file per hour per source; daily
+        to one file per day per source; zarr appends to one store per
+        source.
+    complevel : int
+        0 (default) writes hourly translated files as NETCDF3_CLASSIC; 1-9
+        as NETCDF4_CLASSIC with zlib at that level.
+    threads : int
+        Number of threads used to interpolate each translated hour.
     Returns
     -------
     outpaths : list
@@ -61,20 +73,26 @@ def default(
     if vb > 0:
         print(indates, flush=True)
     # Ignore last date, which cannot be complete by definition
-    outdates = pd.to_datetime(sorted(set(indates.floor('1d')))[:-1])
+    outdates = indates.floor('1d').unique().sort_values()[:-1]
     if vb > 0:
         print(outdates, flush=True)
-    expaths = geoscf_extract(GDNAM, gdpath, indates, ftype=ftype, verbose=vb)
+    expaths = geoscf_extract(
+        GDNAM, gdpath, indates, ftype=ftype, workers=workers,
+        output=extract_output, verbose=vb
+    )
     if extract_only:
         return expaths
     vgtyp, vglvls, vgtop = getvglvls(m3path)
     dpdf = pd.read_csv(f'{GDNAM}/{GDNAM}_{sfx}.csv')
     opths = geoscf2cmaq(
-        GDNAM, gdpath, indates, dpdf, vglvls, vgtop, ftype=ftype, verbose=vb
+        GDNAM, gdpath, indates, dpdf, vglvls, vgtop, ftype=ftype,
+        extract_output=extract_output, complevel=complevel,
+        threads=threads, verbose=vb
     )
     if sfx == 'BCON':
         opths = concat(
-            GDNAM, outdates, intmpl, outtmpl, infreq=cffreq, verbose=vb
+            GDNAM, outdates, intmpl, outtmpl, infreq=cffreq, workers=workers,
+            verbose=vb
         )
     print('\n'.join(opths), flush=True)
     return opths
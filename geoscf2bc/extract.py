@@ -35,83 +35,252 @@ One month costs about a day:
    20.7h = 5 min / hour * 31 days / (8h / day)
 """
 
+import contextlib
+import threading
 import time
 import warnings
 import os
+# HDF5's POSIX file locks serialize concurrent reads on shared file systems
+# (Lustre/GPFS); inputs are only read, so disable them unless the user has
+# chosen otherwise. Set before any HDF5 library is loaded.
+os.environ.setdefault('HDF5_USE_FILE_LOCKING', 'FALSE')
 import numpy as np
 import pandas as pd
-import netCDF4 as nc
-from datetime import datetime
 
 warnings.simplefilter('ignore')
 
 from joblib import Parallel, delayed
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+try:
+    # h5netcdf writes the same netCDF4/HDF5 files through h5py, which has a
+    # shorter open/close path than netCDF-C; netCDF4 is the fallback.
+    import h5netcdf  # noqa: F401
+    ncengine = 'h5netcdf'
+except ImportError:
+    ncengine = 'netcdf4'
+# Only h5netcdf can open files from several threads at once
+ncparallel = ncengine == 'h5netcdf'
+# With netCDF-C, one lock guards every read call and each whole write, so
+# a write never overlaps any other netCDF-C call (see process_and_save).
+nclock = None if ncparallel else threading.Lock()
+
+
+def get_compression(engine):
+    """
+    Get the encoding that compresses extracts: zstd level 1 if engine can
+    both write and read it, otherwise zlib level 1. Extracts are read back
+    with the same engine (ncengine) here and in translate.
+    """
+    zlib = dict(zlib=True, complevel=1)
+    if engine == 'h5netcdf':
+        try:
+            # h5py needs the zstd filter from hdf5plugin; importing it
+            # registers the filter for reading too
+            import hdf5plugin
+        except ImportError:
+            return zlib
+        return dict(hdf5plugin.Zstd(clevel=1))
+    try:
+        import netCDF4
+        if netCDF4.__has_zstandard_support__:
+            return dict(compression='zstd', complevel=1)
+    except (ImportError, AttributeError):
+        pass
+    return zlib
 
-def process_single_date(startdate, mf, cf, xf, metvars, wlonslice, wlatslice, plonslice, platslice, 
-                        GDNAM, sfx, verbose=0, sleep=0):
-    # slicing to avoid exact issues
-    starttime = startdate.strftime('%Y-%m-%d %H:00')
-    endtime = startdate.strftime('%Y-%m-%d %H:45')
-    tv = mf.time.sel(time=slice(starttime, endtime)).values
-    nhours = len(tv)
-    print("Step3")
-    # Tried subsetting time separately, it was horrific.
-    wdwsubset = OrderedDict(time=tv, lon=wlonslice, lat=wlatslice)
-    bcsubset = OrderedDict(lon=plonslice, lat=platslice)
-    print("step4")
-    t0 = time.time()
-    tmpmf = mf[metvars].sel(wdwsubset)
-    times = pd.to_datetime(tmpmf.time.values).to_pydatetime()
-    stime = times[0]
-    etime = times[-1]
 
+nccompression = get_compression(ncengine)
+
+def get_extract_paths(GDNAM, stime, sfx, etime=None, nhours=1,
+                      keys=('met', 'xgc', 'chm')):
+    """
+    Get the extracted file path for each source file type (met, xgc, chm)
+    """
+    if etime is None:
+        etime = stime
     outdir = f'{GDNAM}/{stime:%Y/%m/%d}'
     pathsuf = f'{stime:%Y-%m-%dT%H}_{etime:%Y-%m-%dT%H}_{nhours}h_{sfx}.nc'
-    metpath = f'{outdir}/met_tavg_1hr_g1440x721_v36_{pathsuf}'
-    chmpath = f'{outdir}/chm_tavg_1hr_g1440x721_v36_{pathsuf}'
-    xgcpath = f'{outdir}/xgc_tavg_1hr_g1440x721_v36_{pathsuf}'
+    return OrderedDict([
+        (key, f'{outdir}/{key}_tavg_1hr_g1440x721_v36_{pathsuf}')
+        for key in keys
+    ])
+
+def get_extract_stores(GDNAM, sfx, keys=('met', 'xgc', 'chm')):
+    """
+    Get the zarr store path for each source file type (met, xgc, chm) when
+    geoscf_extract is run with output='zarr'
+    """
+    return OrderedDict([
+        (key, f'{GDNAM}/{key}_tavg_1hr_g1440x721_v36_{sfx}.zarr')
+        for key in keys
+    ])
+
+def get_extract_daypaths(GDNAM, date, sfx, keys=('met', 'xgc', 'chm')):
+    """
+    Get the daily file path for each source file type (met, xgc, chm) when
+    geoscf_extract is run with output='daily'
+    """
+    outdir = f'{GDNAM}/{date:%Y/%m/%d}'
+    pathsuf = f'{date:%Y-%m-%d}_1d_{sfx}.nc'
+    return OrderedDict([
+        (key, f'{outdir}/{key}_tavg_1hr_g1440x721_v36_{pathsuf}')
+        for key in keys
+    ])
+
+def get_store_hours(storepath):
+    """
+    Get the set of hours (floored times) already in a zarr store or daily
+    netCDF file
+    """
+    if not os.path.exists(storepath):
+        return set()
+    if storepath.endswith('.zarr'):
+        times = xr.open_zarr(storepath).time.values
+    else:
+        with xr.open_dataset(storepath, engine=ncengine) as storef:
+            times = storef.time.values
+    return set(pd.to_datetime(times).floor('1h'))
+
+def save_daily(newf, daypath, verbose=0):
+    """
+    Add the hours in newf to the daily file daypath; hours already in
+    daypath are kept as they are.
+    """
+    if os.path.exists(daypath):
+        with xr.open_dataset(daypath, engine=ncengine) as oldf:
+            oldf = oldf.load()
+        isnew = ~newf.indexes['time'].floor('1h').isin(
+            oldf.indexes['time'].floor('1h')
+        )
+        if not isnew.any():
+            return 0
+        newf = xr.concat(
+            [oldf, newf.isel(time=np.flatnonzero(isnew))], dim='time'
+        ).sortby('time')
+    return process_and_save(
+        newf, daypath, verbose=verbose, overwrite=True, unlimited_dims=['time']
+    )
+
+def retry(func, *args, maxtries=5, verbose=0, **kwds):
+    """
+    Return func(*args, **kwds), retrying failures with exponential backoff.
+
+    Transient read errors (e.g., busy file systems) are retried after
+    1, 2, 4, ... seconds (plus jitter, at most 60s); the last failure is
+    raised.
+    """
+    import random
+
+    for attempt in range(maxtries):
+        try:
+            return func(*args, **kwds)
+        except Exception as e:
+            if attempt + 1 >= maxtries:
+                raise
+            wait = min(60, 2**attempt + random.random())
+            if verbose > 0:
+                print(f'Retrying in {wait:.1f}s after: {e}', flush=True)
+            time.sleep(wait)
+
+def nearest_indices(values, targets):
+    """
+    Get the position of the nearest of sorted values for each target
+
+    Equivalent to sel(method='nearest'), including ties going to the larger
+    value. Uniformly spaced values (e.g., the GEOS-CF grid) are indexed
+    arithmetically; otherwise it is one vectorized binary search.
+    """
+    delta = np.diff(values)
+    if delta.size > 0 and np.allclose(delta, delta[0], rtol=1e-6, atol=0):
+        idx = np.floor((targets - values[0]) / delta[0] + 0.5)
+        return np.clip(idx, 0, values.size - 1).astype('i8')
+    idx = np.searchsorted(values, targets)
+    idx = np.clip(idx, 1, values.size - 1)
+    tolower = (targets - values[idx - 1]) < (values[idx] - targets)
+    return idx - tolower
+
+def get_time_slices(times, dates):
+    """
+    Get the integer slice of sorted times from HH:00 to HH:45 of each date
+    """
+    hours = pd.DatetimeIndex(dates).floor('1h').values
+    starts = np.searchsorted(times, hours, side='left')
+    ends = np.searchsorted(times, hours + np.timedelta64(45, 'm'), 'right')
+    return [slice(start, end) for start, end in zip(starts, ends)]
+
+def process_single_date(startdate, allf, filevars, plonslice, platslice,
+                        GDNAM, sfx, output='netcdf', verbose=0, sleep=0,
+                        tslice=None):
+    """
+    Extract the perimeter for one date and write one file per source, or
+    return the loaded perimeter (output='zarr' or 'daily') for the caller to
+    append.
+
+    Parameters:
+    -----------
+    allf: xarray.Dataset
+        Merged met, chm and xgc datasets
+    filevars: OrderedDict
+        Source file type (met, xgc, chm) to the variables written for it
+    plonslice, platslice: xarray.DataArray
+        Integer positions of perimeter cells in allf lon/lat
+    tslice: slice or None
+        Integer positions of startdate's hour in allf time (see
+        get_time_slices). If None, it is computed.
+    """
+    # slicing to avoid exact issues
+    if tslice is None:
+        tslice = get_time_slices(allf.time.values, [startdate])[0]
+    # Slicing the index gives Timestamps without converting all times
+    tv = allf.indexes['time'][tslice]
+    nhours = len(tv)
+    # Tried subsetting time separately, it was horrific.
+    # One pointwise isel selects the hours and perimeter cells together.
+    bcsubset = OrderedDict(time=tslice, lon=plonslice, lat=platslice)
+
+    def load():
+        # Only geoscf_extract(remote=True) pauses between requests
+        if sleep > 0:
+            time.sleep(sleep)
+        return retry(lambda: allf.isel(bcsubset).load(), verbose=verbose)
+
+    if output in ('zarr', 'daily'):
+        return load()
+    stime = tv[0]
+    etime = tv[-1]
+    hourstr = f'{startdate:%Y-%m-%d %H}'
+
+    outpaths = get_extract_paths(
+        GDNAM, stime, sfx, etime=etime, nhours=nhours, keys=tuple(filevars)
+    )
 
     # Create output directory if it doesn't exist
-    os.makedirs(outdir, exist_ok=True)
+    os.makedirs(f'{GDNAM}/{stime:%Y/%m/%d}', exist_ok=True)
     
     # Check if all files exist and skip if they do
-    if os.path.exists(metpath) and os.path.exists(chmpath) and os.path.exists(xgcpath):
+    if all(os.path.exists(outpath) for outpath in outpaths.values()):
         if verbose > 0:
-            print(f'Skipping {starttime} {endtime} (cached)')
-        return []
-    
-    tmpcf = cf.sel(wdwsubset)
-    tmpxf = xf.sel(wdwsubset)
+            print(f'Skipping {hourstr}:00 {hourstr}:45 (cached)')
+        return list(outpaths.values())
+
+    # One selection and one load covers met, chm and xgc
+    t0 = time.time()
+    tmpf = load()
     t1 = time.time()
     
     if verbose > 0:
         print(f'Load: {t1 - t0:.1f}s', flush=True)
-        print(f'Processing {starttime}-{endtime}')
-    
-    local_outpaths = []
-    
-    if verbose > 0:
-        print(f'Retrieve met for {starttime}', end='', flush=True)
-    print("step5")
-    process_and_save(tmpmf, bcsubset, metpath, verbose=verbose)
-    local_outpaths.append(metpath)
-    
-    if verbose > 0:
-        print(f'Retrieve xgc for {starttime}', end='', flush=True)
-    process_and_save(tmpxf, bcsubset, xgcpath, verbose=verbose)
-    local_outpaths.append(xgcpath)
-    
-    if verbose > 0:
-        print(f'Retrieve chm for {starttime}', end='', flush=True)
-    process_and_save(tmpcf, bcsubset, chmpath, verbose=verbose)
-    local_outpaths.append(chmpath)
-    
-    return local_outpaths
+        print(f'Processing {hourstr}:00-{hourstr}:45')
+
+    for key, outpath in outpaths.items():
+        process_and_save(tmpf[filevars[key]], outpath, verbose=verbose)
+
+    return list(outpaths.values())
 
 # Main function that uses joblib to parallelize processing
-def process_dates_parallel(dates, mf, cf, xf, metvars, wlonslice, wlatslice, plonslice, platslice, 
-                           GDNAM, sfx, n_jobs=-1, verbose=0, sleep=0):
+def process_dates_parallel(dates, allf, filevars, plonslice, platslice,
+                           GDNAM, sfx, n_jobs=-1, output='netcdf', verbose=0, sleep=0):
     """
     Process dates in parallel using joblib
     
@@ -121,20 +290,31 @@ def process_dates_parallel(dates, mf, cf, xf, metvars, wlonslice, wlatslice, plo
         Dates to process
     n_jobs: int
         Number of parallel jobs. -1 means using all processors
-    """
-    results = Parallel(n_jobs=n_jobs, verbose=10)(
-        delayed(process_single_date)(
-            startdate, mf, cf, xf, metvars, wlonslice, wlatslice, plonslice, platslice,
-            GDNAM, sfx, verbose=max(0, verbose-1), sleep=sleep
-        ) for startdate in dates
-    )
 
-    # Maintain original order: results are returned in same order as input dates
-    outpaths = []
-    for date_results in results:  # This preserves date order
-        outpaths.extend(date_results)  # This preserves met->xgc->chm order within each date
-    
-    return outpaths    
+    Returns:
+    --------
+    results: list
+        process_single_date result for each date, in the order of dates
+    """
+    # Time positions for all dates from one vectorized search
+    tslices = get_time_slices(allf.time.values, dates)
+    # Threads, not processes: the work is I/O-bound and the datasets are
+    # too expensive to pickle to worker processes. With several date
+    # threads, each load runs on dask's synchronous scheduler rather than
+    # starting its own thread pool; the reads share one HDF5 lock anyway.
+    import dask
+
+    scheduler = 'synchronous' if n_jobs != 1 else None
+    with dask.config.set(scheduler=scheduler):
+        results = Parallel(n_jobs=n_jobs, backend='threading', verbose=10)(
+            delayed(process_single_date)(
+                startdate, allf, filevars, plonslice, platslice,
+                GDNAM, sfx, output=output, verbose=max(0, verbose-1),
+                sleep=sleep, tslice=tslice
+            ) for startdate, tslice in zip(dates, tslices)
+        )
+
+    return results
 
 # Function to get file patterns for a given date
 def get_file_paths(date, file_type):
@@ -156,247 +336,211 @@ def get_file_paths(date, file_type):
     return dir_path, file_pattern
 
 # For processing multiple files, we'll need to open them differently
-# Since we're reading local files, we can use glob to find matching files
-import glob
+# Since we're reading local files, we list directories to find matching files
 import xarray as xr
 
-def clean_dataset_attributes(ds):
-    """Remove problematic attributes that can cause HDF5 errors"""
-    import copy
-    
-    # Create a copy to avoid modifying the original
-    ds_clean = ds.copy()
-    
-    # List of potentially problematic attributes
-    problematic_attrs = [
-        '_ChunkSizes', '_DeflateLevel', '_Shuffle', '_Fletcher32',
-        '_Storage', '_Endianness', '_NoFill', '_Compression',
-        'chunks', 'preferred_chunks'
-    ]
-    
-    # Clean global attributes
-    for attr in problematic_attrs:
-        if attr in ds_clean.attrs:
-            del ds_clean.attrs[attr]
-    
-    # Clean variable attributes
-    for var_name in ds_clean.variables:
-        for attr in problematic_attrs:
-            if attr in ds_clean[var_name].attrs:
-                del ds_clean[var_name].attrs[attr]
-        
-        # Also remove encoding that might cause issues
-        if hasattr(ds_clean[var_name], 'encoding'):
-            ds_clean[var_name].encoding = {}
-    
-    return ds_clean
-
-def process_and_save(tmpf, bcsubset, outpath, verbose=0):
+def process_and_save(tmpf, outpath, verbose=0, overwrite=False,
+                     unlimited_dims=None):
     """
-    Process data from tmpf and save to outpath with attribute cleaning.
+    Save tmpf, already subset to the perimeter, to outpath. Unless
+    overwrite, an existing outpath is kept.
     """
-    import os
-    import time
-    
     os.makedirs(os.path.dirname(outpath), exist_ok=True)
-    
+
     if verbose > 0:
         print(outpath, end='', flush=True)
-    
-    if os.path.exists(outpath):
+
+    if os.path.exists(outpath) and not overwrite:
         if verbose > 0:
             print(' cached', flush=True)
         dt = 0
         return dt
-    else:
-        t0 = time.time()
-        print("step 6")
-        # Process the data
-        subset_data = tmpf.sel(bcsubset)
-        encoding = {}
-        for var in subset_data.variables:
-            # Remove chunking, use compression only
-            encoding[var] = {
-              '_FillValue': None,
-              'zlib': True,
-              'complevel': 1,
-              'chunksizes': None  # Disable explicit chunking
-            }
-
-        print("step 7")
-        #subset_data.to_netcdf(outpath,engine='scipy',format='NETCDF3_64BIT')
-        clean_data = subset_data
-        # Create new netCDF4 file
-
-
-
-    # Create new netCDF4 file
-    with nc.Dataset(outpath, 'w', format='NETCDF4') as ncfile:
-    
-        # Create dimensions
-        for dim_name, dim_size in clean_data.dims.items():
-            ncfile.createDimension(dim_name, dim_size)
-    
-        # Create coordinate variables first
-        for coord_name in clean_data.coords:
-            coord_data = clean_data[coord_name]
-        
-            # Check if it's a datetime variable
-            if np.issubdtype(coord_data.dtype, np.datetime64):
-                # Convert datetime64 to days since a reference date
-                reference_date = datetime(1900, 1, 1)  # Common reference
-            
-                # Convert to numeric (days since reference)
-                try:
-                    # First convert datetime64[ns] to datetime objects
-                    datetime_objects = coord_data.values.astype('datetime64[s]').astype(datetime)
-                
-                    # Then convert to numeric values using netCDF4's function
-                    numeric_data = nc.date2num(
-                        datetime_objects,
-                        units=f'days since {reference_date.strftime("%Y-%m-%d %H:%M:%S")}',
-                        calendar='gregorian'
-                    )
-                
-                    # Create variable as float64
-                    var = ncfile.createVariable(
-                        coord_name, 
-                        'f8',  # float64
-                        coord_data.dims,
-                        zlib=True,
-                        complevel=4
-                    )
-                
-                    # Write numeric data
-                    var[:] = numeric_data
-                
-                    # Add time attributes
-                    var.units = f'days since {reference_date.strftime("%Y-%m-%d %H:%M:%S")}'
-                    var.calendar = 'gregorian'
-                    var.long_name = coord_data.attrs.get('long_name', coord_name)
-                
-                except Exception as e:
-                    print(f"Error converting datetime for {coord_name}: {e}")
-                    # Fallback: store as strings
-                    string_dates = np.array([str(d) for d in coord_data.values])
-                    var = ncfile.createVariable(coord_name, 'S50', coord_data.dims)
-                    var[:] = string_dates
-        
-            else:
-                # Create variable with original datatype
-                var = ncfile.createVariable(
-                    coord_name, 
-                    coord_data.dtype, 
-                    coord_data.dims,
-                    zlib=True,
-                    complevel=4
-                )
-            
-                # Write data
-                var[:] = coord_data.values
-            
-                # Add minimal attributes if needed
-                var.units = coord_data.attrs.get('units', '')
-                var.long_name = coord_data.attrs.get('long_name', coord_name)
-    
-        # Create data variables
-        for var_name in clean_data.data_vars:
-            var_data = clean_data[var_name]
-        
-            # Check if it's a datetime variable
-            if np.issubdtype(var_data.dtype, np.datetime64):
-                # Convert datetime64 to days since a reference date
-                reference_date = datetime(1900, 1, 1)
-            
-                try:
-                    # Convert to datetime objects then to numeric
-                    datetime_objects = var_data.values.astype('datetime64[s]').astype(datetime)
-                    numeric_data = nc.date2num(
-                        datetime_objects,
-                        units=f'days since {reference_date.strftime("%Y-%m-%d %H:%M:%S")}',
-                        calendar='gregorian'
-                    )
-                
-                    # Create variable
-                    var = ncfile.createVariable(
-                        var_name,
-                        'f8',
-                        var_data.dims,
-                        zlib=True,
-                        complevel=4,
-                        fill_value=None
-                    )
-                
-                    # Write data
-                    var[:] = numeric_data
-                
-                    # Add time attributes
-                    var.units = f'days since {reference_date.strftime("%Y-%m-%d %H:%M:%S")}'
-                    var.calendar = 'gregorian'
-                    var.long_name = var_data.attrs.get('long_name', var_name)
-                
-                except Exception as e:
-                    print(f"Error converting datetime for {var_name}: {e}")
-                    # Fallback to string representation
-                    string_dates = np.array([str(d) for d in var_data.values])
-                    var = ncfile.createVariable(var_name, 'S50', var_data.dims)
-                    var[:] = string_dates
-            else:
-                # Create variable
-                var = ncfile.createVariable(
-                    var_name,
-                    var_data.dtype,
-                    var_data.dims,
-                    zlib=True,
-                    complevel=4,
-                    fill_value=None
-                )
-            
-                # Write data
-                var[:] = var_data.values
-            
-                # Add minimal attributes if needed
-                var.units = var_data.attrs.get('units', '')
-                var.long_name = var_data.attrs.get('long_name', var_name)
-    
-        # Add global attributes (minimal)
-        ncfile.title = "Processed data"
-        ncfile.history = f"Created on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-
-        print("step 8")
-        #clean_data.to_netcdf(outpath)
-        t1 = time.time()
-        dt = t1 - t0
-        if verbose > 0:
-                print(f' {dt:.1f}s', flush=True)
-        #except Exception as e:
-        #print(f' ERROR: {str(e)}', flush=True)
-        #dt = 0
-            
+
+    t0 = time.time()
+    # Read outside of the write so other threads can overlap I/O
+    clean_data = tmpf.load()
+    # Small variables (most hourly time x lev x CELLS arrays) are stored
+    # contiguous and uncompressed: no chunk index and no filter to run.
+    # Larger ones (big domains, daily files, which need chunks for their
+    # unlimited time) are compressed in few large chunks, which readers get
+    # in one or a few reads. Level 1 (zstd when available, see
+    # get_compression) gets most of the size reduction for a fraction of
+    # the CPU.
+    unlimited = set(unlimited_dims or [])
+    encoding = {}
+    for key, var in clean_data.variables.items():
+        if var.ndim == 0:
+            continue
+        if var.nbytes < 2**20 and not unlimited.intersection(var.dims):
+            encoding[key] = dict(contiguous=True, _FillValue=None)
+        else:
+            chunksizes = tuple(
+                min(dlen, 1024) if dk == 'CELLS' else dlen
+                for dk, dlen in var.sizes.items()
+            )
+            encoding[key] = dict(
+                nccompression, _FillValue=None, chunksizes=chunksizes
+            )
+    # Data are stored as float32 (GEOS-CF's own precision) even if they
+    # were promoted in memory. Coordinates keep their dtype; translate
+    # matches cells on exact lon/lat.
+    for key, var in clean_data.data_vars.items():
+        if key in encoding and var.dtype.kind == 'f':
+            encoding[key]['dtype'] = 'f4'
+    # Write to a temporary name and rename once complete, so an interrupted
+    # write never leaves a partial file that looks cached.
+    tmppath = outpath + '.tmp'
+    # clean_data is already in memory, so to_netcdf only writes. netCDF-C
+    # is not thread-safe, even across files, so with netcdf4 the whole
+    # write holds nclock; h5py serializes h5netcdf itself.
+    with nclock or contextlib.nullcontext():
+        clean_data.to_netcdf(
+            tmppath, engine=ncengine, encoding=encoding,
+            unlimited_dims=unlimited_dims
+        )
+    os.replace(tmppath, outpath)
+    t1 = time.time()
+    dt = t1 - t0
+    if verbose > 0:
+        print(f' {dt:.1f}s', flush=True)
+
     return dt
 
 def open_dataset_from_files(dates, file_type):
     """
     Open dataset from local files for given dates and file type
     """
-    all_files = []
+    import re
+    import fnmatch
+
+    # Many dates share a day directory; list each directory only once
+    # instead of globbing it for every date.
+    dirpatterns = OrderedDict()
     for date in dates:
         dir_path, file_pattern = get_file_paths(date, file_type)
-        file_path = os.path.join(dir_path, file_pattern)
-        matching_files = glob.glob(file_path)
-        all_files.extend(matching_files)
-    
+        dirpatterns.setdefault(dir_path, set()).add(file_pattern)
+
+    all_files = []
+    for dir_path, file_patterns in dirpatterns.items():
+        matcher = re.compile('|'.join(
+            fnmatch.translate(file_pattern) for file_pattern in file_patterns
+        ))
+        try:
+            with os.scandir(dir_path) as entries:
+                all_files.extend(
+                    entry.path for entry in entries
+                    if matcher.match(entry.name)
+                )
+        except FileNotFoundError:
+            continue
+
     if not all_files:
         raise FileNotFoundError(f"No files found for {file_type}")
     
     # Sort files to ensure proper time ordering
     all_files.sort()
     #print(all_files)
-    # Open multiple files as a single dataset
-    return xr.open_mfdataset(all_files, combine='by_coords')
+    # Open multiple files as a single dataset; parallel=True opens the
+    # files (header reads) concurrently with dask.delayed. netCDF-C is not
+    # thread-safe, so that is only done with h5netcdf, where h5py
+    # serializes its own HDF5 calls and xarray's global lock is skipped.
+    # With netcdf4, reads take nclock, which writes also hold.
+    # Small lat/lon chunks let the perimeter selection read only the
+    # blocks it touches. Sorted names are in time order and all files share
+    # lev/lat/lon, so files are concatenated along time as listed and the
+    # first file's coordinates are used without comparing the rest.
+    return xr.open_mfdataset(
+        all_files, combine='nested', concat_dim='time',
+        data_vars='minimal', coords='minimal', compat='override',
+        engine=ncengine, parallel=ncparallel,
+        lock=False if ncparallel else nclock,
+        chunks={'time': 1, 'lat': 200, 'lon': 200}
+    )
 
 
-def geoscf_extract(GDNAM, gdpath, dates, ftype=2, sleep=60, verbose=1):
+def get_perimeter_map(GDNAM, gdpath, ftype, lon, lat, verbose=0):
+    """
+    Map each GDNAM boundary (ftype=2) or grid (ftype=1) cell to the nearest
+    GEOS-CF lon/lat.
+
+    The map only depends on the grid definition and the GEOS-CF grid, so it
+    is cached in GDNAM/_perimcache_{sfx}_{hash}.npz, keyed on GDNAM, ftype,
+    gdpath (and its modification time) and lon/lat.
+
+    Arguments
+    ---------
+    GDNAM : str
+        Grid definition name.
+    gdpath : str
+        Grid definition file path (GRIDDESC)
+    ftype : int
+        Type 2=bcon; 1=icon
+    lon, lat : np.ndarray
+        GEOS-CF grid coordinates
+    verbose : int
+        Degree of verbosity
+
+    Returns
+    -------
+    locidx, locuidx : pd.DataFrame
+        locidx has the GEOS-CF lon/lat of each cell indexed by the cell
+        lonb/latb; locuidx has the unique lat/lon pairs to extract
+    """
+    import hashlib
+    import PseudoNetCDF as pnc
+
+    sfx = {1: 'ICON', 2: 'BCON'}[ftype]
+    lon = np.asarray(lon)
+    lat = np.asarray(lat)
+    gdstat = os.stat(gdpath)
+    key = hashlib.sha1(
+        f'{GDNAM} {ftype} {os.path.abspath(gdpath)} {gdstat.st_mtime_ns}'
+        .encode()
+    )
+    key.update(lon.tobytes())
+    key.update(lat.tobytes())
+    cachepath = f'{GDNAM}/_perimcache_{sfx}_{key.hexdigest()[:16]}.npz'
+    if os.path.exists(cachepath):
+        if verbose > 0:
+            print('Using cached', cachepath, flush=True)
+        with np.load(cachepath) as cache:
+            cached = dict(cache)
+    else:
+        gf = pnc.pncopen(gdpath, format='griddesc', GDNAM=GDNAM, FTYPE=ftype)
+        # perimiter lon/lat
+        lonb = np.asarray(gf.variables['longitude']).ravel()
+        latb = np.asarray(gf.variables['latitude']).ravel()
+        if verbose > 0:
+            print('GRID', 'ROWS', 'COLS', 'CELLS', flush=True)
+            print(GDNAM, gf.NROWS, gf.NCOLS, lonb.size, flush=True)
+        cached = dict(
+            lonb=lonb, latb=latb,
+            lon=lon[nearest_indices(lon, lonb)],
+            lat=lat[nearest_indices(lat, latb)],
+        )
+        # Perimeter cells that share a GEOS-CF cell are extracted only
+        # once.
+        ucells = pd.DataFrame(dict(lat=cached['lat'], lon=cached['lon']))
+        ucells = ucells.groupby(['lat', 'lon']).size().reset_index()
+        cached['ulat'] = ucells['lat'].values
+        cached['ulon'] = ucells['lon'].values
+        tmppath = cachepath + '.tmp'
+        with open(tmppath, 'wb') as cachef:
+            np.savez(cachef, **cached)
+        os.replace(tmppath, cachepath)
+
+    locidx = pd.DataFrame(dict(
+        lonb=cached['lonb'], latb=cached['latb'],
+        lon=cached['lon'], lat=cached['lat'], count=1
+    )).set_index(['lonb', 'latb'])
+    locuidx = pd.DataFrame(dict(lat=cached['ulat'], lon=cached['ulon']))
+    return locidx, locuidx
+
+
+def geoscf_extract(
+    GDNAM, gdpath, dates, ftype=2, sleep=0, workers=1, output='netcdf',
+    verbose=1, remote=False
+):
     """
     Arguments
     ---------
@@ -409,18 +553,33 @@ def geoscf_extract(GDNAM, gdpath, dates, ftype=2, sleep=60, verbose=1):
     ftype : int
         Type 2=bcon; 1=icon
     sleep : int
-        Number of seconds to sleep in between requests.
+        Number of seconds to sleep in between requests when remote.
+    workers : int
+        Number of dates to process concurrently.
+    output : str
+        netcdf (default) writes one file per date per source (met, xgc, chm)
+        with h5netcdf if it is installed, otherwise with netCDF4.
+        daily writes one file per day per source (see get_extract_daypaths)
+        with the hours along an unlimited time dimension.
+        zarr appends all dates along time to one store per source (see
+        get_extract_stores), which avoids thousands of small files on long
+        runs. Dates should be extracted in increasing order.
     verbose : int
         Degree of verbosity
+    remote : bool
+        If True, get_file_paths points at a remote server and each date's
+        read is preceded by a pause of sleep seconds. Local files (the
+        default) never sleep.
 
     Returns
     -------
-    None
+    outpaths : list
+        Paths extracted (met, xgc, chm for each date or, if output='daily',
+        each day), or the three zarr stores if output='zarr'
     """
     import xarray as xr
     import pandas as pd
     import os
-    import PseudoNetCDF as pnc
     from collections import OrderedDict
     from .defs import griddescpath
 
@@ -430,23 +589,61 @@ def geoscf_extract(GDNAM, gdpath, dates, ftype=2, sleep=60, verbose=1):
 
     os.makedirs(GDNAM, exist_ok=True)
     sfx = {1: 'ICON', 2: 'BCON'}[ftype]
-    gf = pnc.pncopen(gdpath, format='griddesc', GDNAM=GDNAM, FTYPE=ftype)
 
-    # perimiter lon/lat
-    dims = ('CELLS',)
-    lonb = xr.DataArray(gf.variables['longitude'].ravel(), dims=dims)
-    latb = xr.DataArray(gf.variables['latitude'].ravel(), dims=dims)
-    if verbose > 0:
-        print('GRID', 'ROWS', 'COLS', 'CELLS', flush=True)
-        print(GDNAM, gf.NROWS, gf.NCOLS, lonb.size, flush=True)
-    print("step1")
+    # GEOS-CF files are 1-hourly, so each date's outputs are predictable.
+    # Check the cache before opening any inputs and only open what is needed.
+    if output == 'zarr':
+        stores = get_extract_stores(GDNAM, sfx)
+        allpaths = list(stores.values())
+        storehours = {
+            key: get_store_hours(store) for key, store in stores.items()
+        }
+        done = set.intersection(*storehours.values())
+        pending = dates[~dates.floor('1h').isin(list(done))]
+    elif output == 'daily':
+        daypaths = OrderedDict([
+            (day, get_extract_daypaths(GDNAM, day, sfx))
+            for day in dates.floor('1d').unique()
+        ])
+        allpaths = [
+            path for paths in daypaths.values() for path in paths.values()
+        ]
+        done = set.union(*[
+            set.intersection(*[get_store_hours(p) for p in paths.values()])
+            for paths in daypaths.values()
+        ])
+        pending = dates[~dates.floor('1h').isin(list(done))]
+    else:
+        expected = OrderedDict([
+            (date, list(get_extract_paths(GDNAM, date, sfx).values()))
+            for date in dates
+        ])
+        allpaths = [path for paths in expected.values() for path in paths]
+        pending = pd.to_datetime([
+            date for date, paths in expected.items()
+            if not all(os.path.exists(path) for path in paths)
+        ])
+    csvpath = f'{GDNAM}/{GDNAM}_{sfx}.csv'
+    if len(pending) == 0 and os.path.exists(csvpath):
+        if verbose > 0:
+            print('All dates cached; inputs not opened', flush=True)
+        return allpaths
+    elif len(pending) == 0:
+        # Inputs are still needed to map the perimeter
+        pending = dates[:1]
     try:
-       print("Reading mf...")
-       mf = open_dataset_from_files(dates, 'met')
-       print("Reading cf...")
-       cf = open_dataset_from_files(dates, 'chm')
-       print("Reading xf...")
-       xf = open_dataset_from_files(dates, 'xgc')
+       if verbose > 0:
+           print('Reading met, chm, xgc', flush=True)
+       # met, chm and xgc are disjoint file sets, so open them concurrently
+       # when the engine allows it (see open_dataset_from_files).
+       # xarray discovers its backends lazily and not thread-safely, so
+       # do that once before the threads start.
+       xr.backends.list_engines()
+       with ThreadPoolExecutor(max_workers=3 if ncparallel else 1) as pool:
+           mf, cf, xf = pool.map(
+               lambda key: open_dataset_from_files(pending, key),
+               ('met', 'chm', 'xgc')
+           )
     except FileNotFoundError as e:
        print(f"Error opening files: {e}")
        print("Please check the file paths and naming conventions")
@@ -454,28 +651,79 @@ def geoscf_extract(GDNAM, gdpath, dates, ftype=2, sleep=60, verbose=1):
     if verbose > 0:
        print('mapping PERIM to lon/lat', flush=True)
 
-    lonidx = mf.lon.sel(lon=lonb, method='nearest')
-    latidx = mf.lat.sel(lat=latb, method='nearest')
-    locidx = pd.DataFrame(dict(
-        lonb=lonb, latb=latb, lon=lonidx, lat=latidx, count=1
-    )).set_index(['lonb', 'latb'])
-    locuidx = locidx.groupby(['lat', 'lon'], as_index=True).count(
-    ).reset_index()
+    locidx, locuidx = get_perimeter_map(
+        GDNAM, gdpath, ftype, mf.lon.values, mf.lat.values, verbose=verbose
+    )
+    # Perimeter cells that share a GEOS-CF cell are extracted only once.
+    # The csv maps every perimeter cell to its lon/lat, which translate
+    # uses to expand the unique cells back to the full perimeter.
+    if verbose > 0:
+        print(
+            f'{locidx.shape[0]} cells map to {locuidx.shape[0]} unique'
+            + ' GEOS-CF cells', flush=True
+        )
 
-    locidx.to_csv(f'{GDNAM}/{GDNAM}_{sfx}.csv')
+    locidx.to_csv(csvpath)
 
     metvars = ['zl', 'airdens', 'ps', 'delp', 'q', 't']
     metvars_upper = [var.upper() for var in metvars]
     metvars = metvars_upper
-    # Define the slice that extracts a window of the original model
-    wlonslice = slice(*locuidx.lon.quantile([0, 1]).values)
-    wlatslice = slice(*locuidx.lat.quantile([0, 1]).values)
-    # Define the slice that extracts the perimiter from the window (or original
-    # model)
-    plonslice = xr.DataArray(locuidx.lon, dims=('CELLS',))
-    platslice = xr.DataArray(locuidx.lat, dims=('CELLS',))
-
-    print("step2")
-    outpaths = process_dates_parallel(
-       dates, mf, cf, xf, metvars, wlonslice, wlatslice, plonslice, platslice,
-       GDNAM, sfx, n_jobs=1, verbose=verbose, sleep=sleep)
+    # Resolve labels to integer positions once, so that each date uses
+    # isel and skips label lookups.
+    lonindex = mf.indexes['lon']
+    latindex = mf.indexes['lat']
+    # Define the positions that extract the perimiter
+    cells = dict(CELLS=locuidx.index.values)
+    plonslice = xr.DataArray(
+        lonindex.get_indexer(locuidx.lon), dims=('CELLS',), coords=cells
+    )
+    platslice = xr.DataArray(
+        latindex.get_indexer(locuidx.lat), dims=('CELLS',), coords=cells
+    )
+
+    # Merge before subsetting so each date needs one selection and one load.
+    # GEOS-CF met, chm and xgc share the same time/lev/lat/lon coordinates.
+    allf = xr.merge(
+        [mf[metvars], cf, xf], join='override', compat='override'
+    )
+    filevars = OrderedDict(
+        met=metvars, xgc=list(xf.data_vars), chm=list(cf.data_vars)
+    )
+
+    results = process_dates_parallel(
+       pending, allf, filevars, plonslice, platslice,
+       GDNAM, sfx, n_jobs=workers, output=output, verbose=verbose,
+       sleep=sleep if remote else 0)
+
+    if output == 'zarr':
+        # Appends are done here, in date order, rather than from threads
+        newf = xr.concat(results, dim='time').drop_encoding()
+        for key, store in stores.items():
+            keyf = newf[filevars[key]]
+            isnew = ~keyf.indexes['time'].floor('1h').isin(
+                list(storehours[key])
+            )
+            keyf = keyf.isel(time=np.flatnonzero(isnew)).chunk({'time': 1})
+            if keyf.sizes['time'] == 0:
+                continue
+            if verbose > 0:
+                print(f'Appending {keyf.sizes["time"]}h to {store}')
+            if os.path.exists(store):
+                keyf.to_zarr(
+                    store, mode='a', append_dim='time', consolidated=True
+                )
+            else:
+                keyf.to_zarr(store, mode='w', consolidated=True)
+    elif output == 'daily':
+        # Daily files are rewritten here, once per day, rather than from
+        # threads
+        newf = xr.concat(results, dim='time')
+        newdays = newf.indexes['time'].floor('1d')
+        for day, paths in daypaths.items():
+            dayf = newf.isel(time=np.flatnonzero(newdays == day))
+            if dayf.sizes['time'] == 0:
+                continue
+            for key, daypath in paths.items():
+                save_daily(dayf[filevars[key]], daypath, verbose=verbose)
+
+    return allpaths
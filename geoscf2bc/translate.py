@@ -19,7 +19,9 @@ import pandas as pd
 import PseudoNetCDF as pnc
 import numpy as np
 import argparse
+import functools
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 import PseudoNetCDF.geoschemfiles._vertcoord
 
 hyai = pnc.geoschemfiles._vertcoord.geos_hyai['GEOS-5-NATIVE']
@@ -50,7 +52,16 @@ _ = _prsr.add_argument(
     help='Path to IOAPI GRIDDESC file with GDNAM definition'
 )
 _ = _prsr.add_argument(
-    '--ftype', default=2, help='2=bcon; 1=icon'
+    '--ftype', default=2, type=int, help='2=bcon; 1=icon'
+)
+_ = _prsr.add_argument(
+    '--workers', default=None, type=int,
+    help='Number of dates to translate concurrently (default: one per date'
+    + ' up to the number of CPUs)'
+)
+_ = _prsr.add_argument(
+    '--complevel', default=0, type=int,
+    help='0 writes NETCDF3_CLASSIC; 1-9 writes NETCDF4_CLASSIC with zlib'
 )
 _ = _prsr.add_argument(
     'GDNAM', help='Grid name (e.g., 12US1, 12US2, 36US3) defined in gdpath'
@@ -66,10 +77,15 @@ _ = _prsr.add_argument(
 # 34567890123456789012345678901234567890123456789012345678901234567890123456789
 
 
+_vglvlscache = {}
+
+
 def getvglvls(m3path=None):
     """
     Returns a set of IOAPI VGTYP, VGLVLS, and VGTOP that define the vertical
-    coordinate of a CMAQ domain.
+    coordinate of a CMAQ domain. Results are cached by m3path and its
+    modification time, so repeated driver calls do not reopen the METCRO3D
+    file, but a replaced file is reread; do not modify vglvls in place.
 
     Arguments
     ---------
@@ -84,6 +100,14 @@ def getvglvls(m3path=None):
         IOAPI definition.
     """
     import PseudoNetCDF as pnc
+    import os
+
+    if m3path is None:
+        key = None
+    else:
+        key = (m3path, os.stat(m3path).st_mtime_ns)
+    if key in _vglvlscache:
+        return _vglvlscache[key]
     if m3path is not None:
         vgf = pnc.pncopen(m3path, format='ioapi')
         vgtop = vgf.VGTOP
@@ -105,7 +129,222 @@ def getvglvls(m3path=None):
         )
         print(vglvls, flush=True)
 
-    return vgtyp, vglvls, vgtop
+    _vglvlscache[key] = vgtyp, vglvls, vgtop
+    return _vglvlscache[key]
+
+
+@functools.lru_cache(maxsize=None)
+def getdef(defpath):
+    """
+    Returns the source and compiled code of a variable definition file.
+    Results are cached by defpath, so each file is read and compiled once
+    per process rather than once per output hour.
+
+    Arguments
+    ---------
+    defpath : str
+        Path to a definition file (e.g., defs/geoscf_cb6r4.txt)
+
+    Returns
+    -------
+    defsrc, defcode : str, code
+        Text of the file (for metadata) and its code object for exec
+    """
+    with open(defpath, 'r') as deff:
+        defsrc = deff.read()
+    return defsrc, compile(defsrc, defpath, 'exec')
+
+
+@functools.lru_cache(maxsize=16)
+def getfileattrs(cwd):
+    """
+    Returns the HISTORY, FILEDESC and description attributes of translated
+    files. They only depend on the working directory and the definition
+    files, so they are built (and padded for IOAPI) once per process.
+
+    Arguments
+    ---------
+    cwd : str
+        Working directory where the extracted files are
+
+    Returns
+    -------
+    attrs : dict
+        File attributes for geoscf2cmaq outputs; do not modify in place.
+    """
+    from . import __version__ as proc_version
+    from .cmaqready import _ioapistr
+    from .defs import metdefpath, cb6r4defpath, ae7defpath
+
+    FILEDESC = (
+        f'BCON created using geoscf2bc.translate.geoscf2cmaq (v{proc_version})'
+        + f' using files in {cwd}:\n'
+        + ' - defs/geoscf_met.txt\n'
+        + ' - defs/geoscf_cb6r4.txt\n'
+        + ' - defs/geoscf_ae7.txt\n'
+        + 'see description (non IOAPI metadata)'
+    )
+    description = (
+        f'# defs/geoscf_met.txt:\n{getdef(metdefpath)[0]}\n\n'
+        + f'# defs/geoscf_cb6r4.txt:\n{getdef(cb6r4defpath)[0]}\n\n'
+        + f'# defs/geoscf_ae7.txt:\n{getdef(ae7defpath)[0]}\n\n'
+    )
+    return dict(
+        HISTORY=_ioapistr('Created using GEOS_CF_Translate.ipynb'),
+        FILEDESC=_ioapistr(FILEDESC),
+        description=description
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def getsigmaweights(srcvglvls, srcvgtop, vglvls, vgtop):
+    """
+    Returns the matrix that linearly interpolates layer values from the
+    source to the destination sigma coordinate, as in
+    PseudoNetCDF's interpSigma(interptype='linear'). The weights only depend
+    on the coordinates, so they are cached for all hours of a run.
+
+    Arguments
+    ---------
+    srcvglvls : tuple
+        Source sigma edges (e.g., tuple(CF_VGLVLS))
+    srcvgtop : float
+        Source top pressure in Pascals
+    vglvls : tuple
+        Destination sigma edges
+    vgtop : float
+        Destination top pressure in Pascals
+
+    Returns
+    -------
+    weights : np.ndarray
+        Shape (ndst, nsrc) float32, so weights @ data interpolates float32
+        data (..., nsrc, ncell) along layers without promoting to float64;
+        do not modify in place.
+    """
+    from PseudoNetCDF.coordutil import getinterpweights
+
+    srcvglvls = np.asarray(srcvglvls)
+    vglvls = np.asarray(vglvls)
+    if vgtop != srcvgtop:
+        dp0 = 101325. - srcvgtop
+        dp1 = 101325. - vgtop
+        srcvglvls = (srcvglvls * dp0 + srcvgtop - vgtop) / dp1
+    # Interpolate between layer midpoints
+    zs = (srcvglvls[:-1] + srcvglvls[1:]) / 2.
+    nzs = (vglvls[:-1] + vglvls[1:]) / 2.
+    weights = getinterpweights(zs, nzs, kind='linear')
+    return np.ascontiguousarray(weights.T, dtype='f')
+
+
+_holdercache = {}
+
+
+def getholder(gdpath, GDNAM, ftype, vglvls, units, sdate):
+    """
+    Returns an empty IOAPI file on GDNAM with one time step at sdate and a
+    variable for each key of units. Parsing GRIDDESC and creating each
+    variable is done once per grid, layers and units; later calls copy
+    that template without the PseudoNetCDF createVariable machinery.
+
+    Arguments
+    ---------
+    gdpath : str
+        Path to the GRIDDESC file that defines GDNAM
+    GDNAM : str
+        Name of grid definition
+    ftype : int
+        1=icon; 2=bcon
+    vglvls : np.ndarray
+        Vertical coordinate edges of the file
+    units : dict
+        Units (16 characters) for each variable
+    sdate : datetime
+        Time of the single time step
+
+    Returns
+    -------
+    bcf : PseudoNetCDFFile
+        New file; its arrays are not shared with the template
+    """
+    vglvls = np.asarray(vglvls, dtype='f')
+    key = (
+        gdpath, GDNAM, ftype, vglvls.tobytes(), tuple(sorted(units.items()))
+    )
+    if key not in _holdercache:
+        # VGTOP stays CF_VGTOP, as interpSigma left it.
+        _holdercache[key] = pnc.pncopen(
+            gdpath, format='griddesc', GDNAM=GDNAM, FTYPE=ftype,
+            NLAYS=vglvls.size - 1, VGLVLS=vglvls, VGTOP=CF_VGTOP,
+            VGTYP=-9999, SDATE=np.int32(0), STIME=np.int32(0),
+            TSTEP=np.int32(10000), nsteps=1, var_kwds=units, withcf=False
+        )
+    tmplf = _holdercache[key]
+    bcf = tmplf.copy(variables=False)
+    for k, tmplv in tmplf.variables.items():
+        bcf.variables[k] = tmplv.copy()
+    # Properties were copied before there were variables
+    bcf.NVARS = tmplf.NVARS
+    jday = np.int32(sdate.strftime('%Y%j'))
+    hhmmss = np.int32(sdate.strftime('%H%M%S'))
+    bcf.SDATE = jday
+    bcf.STIME = hhmmss
+    # Same values as updatetflag, without recreating TFLAG
+    bcf.variables['TFLAG'][:, :, 0] = jday
+    bcf.variables['TFLAG'][:, :, 1] = hhmmss
+    return bcf
+
+
+_cellindexcache = {}
+
+
+def getcellindex(dpdf, srcf):
+    """
+    Returns the source CELLS for each destination cell in dpdf, matched on
+    lon/lat. The mapping is the same for every hour of a run, so it is
+    cached by the destination and source lon/lat.
+
+    Arguments
+    ---------
+    dpdf : pd.DataFrame
+        Destination cells with lon and lat (see geoscf2cmaq)
+    srcf : xarray.Dataset
+        Extracted file with lon and lat coordinates on CELLS
+
+    Returns
+    -------
+    cellidx : np.ndarray
+        Source CELLS in the order of dpdf
+    """
+    import hashlib
+
+    key = hashlib.blake2b()
+    for vals in (
+        dpdf['lon'].values, dpdf['lat'].values,
+        srcf['lon'].values, srcf['lat'].values, srcf['CELLS'].values
+    ):
+        key.update(np.ascontiguousarray(vals).tobytes())
+    key = key.hexdigest()
+    if key not in _cellindexcache:
+        # Exact lon/lat match with one complex key per cell (sorted by lon,
+        # then lat): sort the source keys and binary search the destination
+        # keys instead of a DataFrame merge.
+        def cellkey(lon, lat):
+            return np.asarray(lon, dtype='d') + 1j * np.asarray(lat, dtype='d')
+
+        srckey = cellkey(srcf['lon'].values, srcf['lat'].values)
+        dstkey = cellkey(dpdf['lon'].values, dpdf['lat'].values)
+        order = np.argsort(srckey, kind='stable')
+        pos = np.searchsorted(srckey[order], dstkey)
+        srcidx = order[pos.clip(max=order.size - 1)]
+        # Like the merge, each destination cell must match exactly one
+        # source cell
+        assert (srckey[srcidx] == dstkey).all()
+        assert np.unique(srckey).size == srckey.size
+        cells = srcf['CELLS'].values[srcidx]
+        _cellindexcache[key] = cells.astype(np.intp)
+
+    return _cellindexcache[key]
 
 
 cf_refp = 101325.
@@ -114,16 +353,95 @@ _approxp = (cf_refp * hybi + hyai * 100)
 CF_VGLVLS = (
     (_approxp - CF_VGTOP)[:37] / (cf_refp - CF_VGTOP)
 ).astype('f')
-warnings.warn(
-    'Vertical interpolation assumes GEOS-CF is in a terrain following partial'
-    + f' pressure coordinate with a surface pressure P={cf_refp} and'
-    + f' VGTOP={CF_VGTOP}'
-)
+
+
+@functools.lru_cache(maxsize=None)
+def _warnvertical():
+    """
+    Warns, once per process and only when translating, that the vertical
+    interpolation approximates GEOS-CF layers as sigma.
+    """
+    warnings.warn(
+        'Vertical interpolation assumes GEOS-CF is in a terrain following'
+        + f' partial pressure coordinate with a surface pressure P={cf_refp}'
+        + f' and VGTOP={CF_VGTOP}'
+    )
+
+
+def savebcf(bcf, outpath, complevel=0):
+    """
+    Writes bcf to outpath with netCDF4 directly: one bulk attribute set per
+    file and variable, no auto mask/scale and no pre-fill (every value is
+    written). Equivalent to bcf.save, without PseudoNetCDF's per-attribute
+    copy. The file is written to a temporary name and renamed when
+    complete, so an interrupted write never looks cached.
+
+    Arguments
+    ---------
+    bcf : PseudoNetCDFFile
+        IOAPI file to write
+    outpath : str
+        Path to write
+    complevel : int
+        0 writes NETCDF3_CLASSIC; 1-9 writes NETCDF4_CLASSIC with zlib at
+        that level (and shuffle)
+
+    Returns
+    -------
+    None
+    """
+    import netCDF4 as nc
+    import os
+
+    if complevel > 0:
+        ncformat = 'NETCDF4_CLASSIC'
+        varkwds = dict(zlib=True, complevel=complevel, shuffle=True)
+    else:
+        ncformat = 'NETCDF3_CLASSIC'
+        varkwds = {}
+    tmppath = outpath + '.tmp'
+    with nc.Dataset(tmppath, 'w', format=ncformat) as outf:
+        outf.set_fill_off()
+        for dk, dim in bcf.dimensions.items():
+            outf.createDimension(dk, None if dim.isunlimited() else len(dim))
+        outf.setncatts({pk: bcf.getncattr(pk) for pk in bcf.ncattrs()})
+        for vk, var in bcf.variables.items():
+            outvar = outf.createVariable(
+                vk, var.dtype, var.dimensions, **varkwds
+            )
+            outvar.set_auto_maskandscale(False)
+            outvar.setncatts({pk: var.getncattr(pk) for pk in var.ncattrs()})
+            outvar[:] = np.asarray(var)
+    os.replace(tmppath, outpath)
+
+
+def get_translate_path(GDNAM, sdate, ftype=2):
+    """
+    Returns the path geoscf2cmaq writes for sdate
+
+    Arguments
+    ---------
+    GDNAM : str
+        Name of grid definition
+    sdate : datetime
+        Must support strftime
+    ftype : int
+        1=icon; 2=bcon
+
+    Returns
+    -------
+    outpath : str
+        Path of the hourly translated file
+    """
+    sfx = {1: 'ICON', 2: 'BCON'}[ftype]
+    bcsuffix = f'{GDNAM}_{sdate:%FT%H}_{sdate:%FT%H}_1h.nc'
+    return f'{GDNAM}/{sdate:%Y/%m/%d}/{sfx}_geoscf_cb6r3_ae7_{bcsuffix}'
 
 
 def geoscf2cmaq(
     GDNAM, gdpath, sdate, dpdf, vglvls, vgtop, ftype=2, persist=True,
-    overwrite=False, verbose=0
+    overwrite=False, extract_output='netcdf', complevel=0, threads=1,
+    verbose=0
 ):
     """
     Convert GEOS-CF species and format to CMAQ
@@ -141,18 +459,29 @@ def geoscf2cmaq(
         in order of IOAPI storage (ravel of PERIM or ravel of ROW, COL).
         Typically, an artifact of `geoscf_extract`
     vglvls : np.ndarray
-        Vertical coordinate for the output file (used by ioapi.interpSigma).
+        Vertical coordinate for the output file (used by getsigmaweights).
         Typically, sigma: (p - ptop) / (psfc - ptop) ranging from 1 to 0.
         Newer WRF uses a hybrid and sigma is just an approximation.
     vgtop : float
         Minimum pressure in Pascals for the output file (used by
-        ioapi.interpSigma)
+        getsigmaweights)
     ftype : int
         1=icon; 2=bcon
     presist : bool
         If True, write the file to disk
     overwrite : bool
         If True, overwrite existing files
+    extract_output : str
+        Format geoscf_extract was run with: netcdf (files per hour), daily
+        (files per day) or zarr (one store per source file type)
+    complevel : int
+        0 (default) writes NETCDF3_CLASSIC. 1-9 writes NETCDF4_CLASSIC with
+        zlib at that level (and shuffle), which CMAQ 5.3+ and cmaqready
+        read; smaller files help when storage bandwidth is the limit.
+    threads : int
+        Number of threads that resample and interpolate variables. 1
+        (default) suits runs that already translate dates in separate
+        processes.
     verbose : int
         Level of verbosity
 
@@ -163,7 +492,6 @@ def geoscf2cmaq(
     """
     import xarray as xr
     import os
-    from . import __version__ as proc_version
     from .defs import metdefpath, cb6r4defpath, ae7defpath, griddescpath
 
     if gdpath is None:
@@ -175,7 +503,9 @@ def geoscf2cmaq(
         for sdate in sdates:
             outbcf, outpath = geoscf2cmaq(
                 GDNAM, gdpath, sdate, dpdf, vglvls, vgtop, ftype=ftype,
-                persist=persist, overwrite=overwrite
+                persist=persist, overwrite=overwrite,
+                extract_output=extract_output, complevel=complevel,
+                threads=threads, verbose=verbose
             )
             outpaths.append(outpath)
         return outpaths
@@ -190,48 +520,69 @@ def geoscf2cmaq(
     metpath = f'{GDNAM}/{sdate:%Y/%m/%d}/met_tavg_1hr_g1440x721_v36_{suffix}'
     chmpath = f'{GDNAM}/{sdate:%Y/%m/%d}/chm_tavg_1hr_g1440x721_v36_{suffix}'
     xgcpath = f'{GDNAM}/{sdate:%Y/%m/%d}/xgc_tavg_1hr_g1440x721_v36_{suffix}'
-    bcsuffix = f'{GDNAM}_{sdate:%FT%H}_{sdate:%FT%H}_1h.nc'
-    outpath = f'{GDNAM}/{sdate:%Y/%m/%d}/{sfx}_geoscf_cb6r3_ae7_{bcsuffix}'
+    outpath = get_translate_path(GDNAM, sdate, ftype=ftype)
     if os.path.exists(outpath) and persist and not overwrite:
         print(outpath, 'cached', end='\r', flush=True)
         return None, outpath
 
     # Open input files
-    metf = xr.open_dataset(metpath)
-    chmf = xr.open_dataset(chmpath)
-    xgcf = xr.open_dataset(xgcpath)
-
-    # Source Cells Data Frame (spdf)
-    spdf = metf[['lat', 'lon']].to_dataframe()
+    from .extract import ncengine, ncparallel
+    if extract_output in ('zarr', 'daily'):
+        from .extract import get_extract_stores, get_extract_daypaths
+        if extract_output == 'zarr':
+            stores = get_extract_stores(GDNAM, sfx)
+            opener = xr.open_zarr
+        else:
+            stores = get_extract_daypaths(GDNAM, sdate, sfx)
+            opener = functools.partial(xr.open_dataset, engine=ncengine)
+        # Mask rather than label slice so append order does not matter
+        stime = np.datetime64(sdate.strftime('%Y-%m-%dT%H:00'))
+        etime = stime + np.timedelta64(1, 'h')
+
+        def openhour(store):
+            f = opener(store)
+            t = f.time.values
+            return f.isel(time=np.flatnonzero((t >= stime) & (t < etime)))
+    else:
+        stores = {'met': metpath, 'chm': chmpath, 'xgc': xgcpath}
+        openhour = functools.partial(xr.open_dataset, engine=ncengine)
+
+    # met, chm and xgc are separate files, so open them concurrently when
+    # the engine allows it (see geoscf2bc.extract.geoscf_extract). Reads
+    # stay unchunked: a perimeter hour is small and is pulled with .values.
+    xr.backends.list_engines()
+    with ThreadPoolExecutor(max_workers=3 if ncparallel else 1) as pool:
+        metf, chmf, xgcf = pool.map(
+            openhour, [stores[key] for key in ('met', 'chm', 'xgc')]
+        )
 
     # Mapping from source to destination
-    sdpdf = dpdf.merge(
-        spdf.reset_index(), left_on=['lon', 'lat'], right_on=['lon', 'lat']
-    )
-    assert (sdpdf.shape[0] == dpdf.shape[0])
-
-    # Plot cells of source data
-    # plt.scatter(sdpdf.lon, sdpdf.lat, c=dpdf.index)
+    cellidx = getcellindex(dpdf, metf)
 
     # Combine met, chm, xgc for easy access
     allvars = {k: v for k, v in metf.data_vars.items()}
     allvars.update({k: v for k, v in chmf.data_vars.items()})
     allvars.update({k: v for k, v in xgcf.data_vars.items()})
+    # Output is float32, so keep every intermediate in float32 even if the
+    # extracted files were written as float64
+    for k, v in allvars.items():
+        if v.dtype == np.float64:
+            allvars[k] = v.astype('f')
 
     # Calculate output met vars
-    mcdef = open(metdefpath, 'r').read()
+    mcdefcode = getdef(metdefpath)[1]
     metsvars = {}
-    exec(mcdef, allvars, metsvars)
+    exec(mcdefcode, allvars, metsvars)
 
     # Calculate output gas vars
-    gcdef = open(cb6r4defpath, 'r').read()
+    gcdefcode = getdef(cb6r4defpath)[1]
     gcsvars = {}
-    exec(gcdef, allvars, gcsvars)
+    exec(gcdefcode, allvars, gcsvars)
 
     # Calculate output aerosol vars
-    aedef = open(ae7defpath, 'r').read()
+    aedefcode = getdef(ae7defpath)[1]
     aesvars = {}
-    exec(aedef, allvars, aesvars)
+    exec(aedefcode, allvars, aesvars)
 
     # Combine defined variables for easy access
     outvars = {k: v for k, v in gcsvars.items()}
@@ -252,54 +603,63 @@ def geoscf2cmaq(
     units['DENS'] = 'kg/m**3'.ljust(16)
     units['AIRMOLDENS'] = 'mole/m**3'.ljust(16)
 
-    # Prep a holder file
-    bcf = pnc.pncopen(
-        gdpath, format='griddesc', GDNAM=GDNAM, FTYPE=ftype,
-        NLAYS=CF_VGLVLS.size - 1, VGLVLS=CF_VGLVLS, VGTOP=CF_VGTOP,
-        VGTYP=-9999, SDATE=np.int32(sdate.strftime('%Y%j')),
-        STIME=np.int32(sdate.strftime('%H%M%S')),
-        TSTEP=np.int32(10000), nsteps=1, var_kwds=units, withcf=False
-    )
+    _warnvertical()
+    # Vertical interpolation from CF_VGLVLS to vglvls as one matrix product
+    # per variable. GEOS-CF lev is top down, so the weights are reversed
+    # along the source axis instead of inverting each variable.
+    weights = getsigmaweights(
+        tuple(CF_VGLVLS.tolist()), CF_VGTOP,
+        tuple(np.asarray(vglvls).tolist()), vgtop
+    )[:, ::-1]
+
+    # Prep a holder file on the output layers
+    outbcf = getholder(gdpath, GDNAM, ftype, vglvls, units, sdate)
+    # Stack all output variables on (time, lev, CELLS), then resample CELLS
+    # to match output IOAPI CELLS order (PERIM or ROW, COL) and interpolate
+    # layers once for all of them.
+    griddims = ('time', 'lev', 'CELLS')
+    datakeys = [k for k, v in outvars.items() if not isinstance(v, str)]
+    stack = np.stack([
+        outvars[k].transpose(*griddims).values for k in datakeys
+    ])
+
+    def interpcells(part):
+        return np.matmul(weights, part.take(cellidx, axis=3))
+
+    if threads > 1:
+        # take and matmul release the GIL, so variable groups run in
+        # parallel threads
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            stack = np.concatenate(list(pool.map(
+                interpcells, np.array_split(stack, threads)
+            )))
+    else:
+        stack = interpcells(stack)
     # Load the data into the file
-    for k, v in outvars.items():
-        # Invert lev to match geos-chem expectations
-        # Resample CELLS to match output IOAPI CELLS order (PERIM or ROW, COL)
-        outvar = bcf.variables[k]
-        print(v)
-        if not isinstance(v, str):
-           vals = v.transpose(
-             'time', 'lev', 'CELLS'
-             )[:, ::-1, sdpdf.CELLS.values]
-        #else:
-        #vals = v  # or any other appropriate handling
-           outvar[:] = vals.data.reshape(outvar.shape)
-
-    outbcf = bcf.interpSigma(vglvls=vglvls, vgtop=vgtop, interptype='linear')
-    FILEDESC = (
-        f'BCON created using geoscf2bc.translate.geoscf2cmaq (v{proc_version})'
-        + f' using files in {os.getcwd()}:\n'
-        + ' - defs/geoscf_met.txt\n'
-        + ' - defs/geoscf_cb6r4.txt\n'
-        + ' - defs/geoscf_ae7.txt\n'
-        + 'see description (non IOAPI metadata)'
-    )
-    description = (
-        f'# defs/geoscf_met.txt:\n{mcdef}\n\n'
-        + f'# defs/geoscf_cb6r4.txt:\n{gcdef}\n\n'
-        + f'# defs/geoscf_ae7.txt:\n{aedef}\n\n'
-    )
-    outbcf.setncatts(dict(
-        HISTORY='Created using GEOS_CF_Translate.ipynb'.ljust(60*80)[:60*80],
-        FILEDESC=FILEDESC.ljust(60*80)[:60*80],
-        description=description
-    ))
+    for k, vals in zip(datakeys, stack):
+        if verbose > 1:
+            print(k, flush=True)
+        outvar = outbcf.variables[k]
+        outvar[:] = vals.reshape(outvar.shape)
+
+    outbcf.setncatts(getfileattrs(os.getcwd()))
     # Persist file to disk
     if persist:
-        outbcf.save(outpath, format='NETCDF3_CLASSIC', verbose=0).close()
+        os.makedirs(os.path.dirname(outpath), exist_ok=True)
+        savebcf(outbcf, outpath, complevel=complevel)
 
     return outbcf, outpath
 
 
+def _translatepath(**kwds):
+    """
+    Returns only the output path of geoscf2cmaq(**kwds), so that worker
+    processes do not send the file back.
+    """
+    outbcf, outpath = geoscf2cmaq(**kwds)
+    return outpath
+
+
 if __name__ == '__main__':
     # args = _prsr.parse_args(
     #   '--gdpath=/home/bhenders/GRIDDESC', '12US1', '2023-04-01', '2023-04-02'
@@ -311,10 +671,32 @@ if __name__ == '__main__':
     dpdf = pd.read_csv(f'{GDNAM}/{GDNAM}_{sfx}.csv')
     vgtyp, vglvls, vgtop = getvglvls(args.m3path)
 
-    for sdate in pd.date_range(args.SDATE, args.EDATE, freq=args.freq):
-        bcf, bcpath = geoscf2cmaq(
+    import os
+    from joblib import Parallel, delayed
+    # Under ``python -m`` this module is __main__, which loky workers cannot
+    # import; use the package module so the cached helpers pickle by name.
+    from geoscf2bc.translate import _translatepath
+
+    sdates = pd.date_range(args.SDATE, args.EDATE, freq=args.freq)
+    bcpaths = [
+        get_translate_path(GDNAM, sdate, ftype=args.ftype) for sdate in sdates
+    ]
+    # stat is much cheaper than starting a worker that finds the output is
+    # cached, so only dates without an output are dispatched.
+    pending = [
+        sdate for sdate, bcpath in zip(sdates, bcpaths)
+        if not os.path.exists(bcpath)
+    ]
+    print(f'{len(sdates) - len(pending)} of {len(sdates)} cached', flush=True)
+    workers = args.workers or max(1, min(len(pending), os.cpu_count()))
+    # Each sdate is an independent output file, so dates are translated in
+    # separate processes; only the output path is sent back.
+    Parallel(n_jobs=workers, backend='loky', verbose=10)(
+        delayed(_translatepath)(
             GDNAM=GDNAM, gdpath=gdpath, sdate=sdate,
-            dpdf=dpdf, vglvls=vglvls, vgtop=vgtop,
-            overwrite=False
+            dpdf=dpdf, vglvls=vglvls, vgtop=vgtop, ftype=args.ftype,
+            complevel=args.complevel, overwrite=False
         )
-        print(bcpath + ' '*20, end='\r', flush=True)
+        for sdate in pending
+    )
+    print('\n'.join(bcpaths), flush=True)
@@ -3,7 +3,8 @@ import numpy as np
 import datetime
 import warnings
 import time
-from joblib import Parallel, delayed
+import os
+from joblib import Parallel, delayed, parallel_config
 
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
@@ -22,8 +23,15 @@ def run_bcon(date1,date2):
 
 datarange = _daterange(datetime.date(2023, 6, 1), datetime.date(2023, 7, 1))
 datarange = list(datarange)
+# Skip days whose CMAQ-ready file already exists with a stat, rather than
+# starting a worker to find out
+bctmpl = 'CONUS_8km/%Y/%m/%d/BCON_geoscf_cb6r3_ae7_CONUS_8km_%Y-%m-%dT%H_25h.nc'
+datarange = [d for d in datarange if not os.path.exists(d.strftime(bctmpl))]
 output_files = []
-out = Parallel(n_jobs=12,verbose=10)(delayed(run_bcon)(
+# Days are the outer level of parallelism; limit each day's worker to one
+# native thread (BLAS/OpenMP) so 12 days do not oversubscribe the node.
+with parallel_config(backend='loky', inner_max_num_threads=1):
+    out = Parallel(n_jobs=12,verbose=10)(delayed(run_bcon)(
            datarange[k].strftime('%Y%m%d'),(datarange[k] + datetime.timedelta(days=1)).strftime('%Y%m%d')) for k in range(len(datarange)))
 
 icpaths = default(
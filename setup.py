@@ -29,6 +29,7 @@ setuptools.setup(
     ],
     python_requires='>=3.6',
     install_requires=["pyproj", "PseudoNetCDF", "xarray", "pandas"],
+    extras_require={"zarr": ["zarr", "dask"]},
     include_package_data=True,
     zip_safe=False,
 )